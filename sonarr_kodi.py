@@ -4,7 +4,7 @@
 import logging
 import sys
 from pathlib import Path
-from src import ConfigParser, LibraryManager, EventHandler, ENV, Events, config_log
+from src import ConfigParser, ENV, config_log
 
 APP_DIR = Path(__file__).resolve().parent
 CONFIG_PATH = APP_DIR / "settings.yaml"
@@ -20,49 +20,38 @@ def main() -> None:
         log.warning("Default config file detected. Please EDIT %s", CONFIG_PATH)
         sys.exit(0)
     log.info("Starting...")
-    kodi = LibraryManager(cfg.hosts, cfg.library.path_mapping)
-    event_handler = EventHandler(ENV, cfg, kodi)
 
-    log.debug("========== Environment ==========")
-    for k, v in ENV.raw_vars.items():
-        log.debug("%s = %s", k, v)
-    log.debug("========== Environment ==========")
+    # Deferred until a usable config is confirmed. The Kodi client pulls in requests
+    from src.kodi import LibraryManager  # pylint: disable=import-outside-toplevel
+    from src.event_handler import EventHandler  # pylint: disable=import-outside-toplevel
+
+    # Skip the environment dump entirely unless debugging
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("========== Environment ==========")
+        for k, v in ENV.raw_vars.items():
+            log.debug("%s = %s", k, v)
+        log.debug("========== Environment ==========")
+
+    # Notification only events have nothing to do when disabled, exit before connecting to any host
+    notification = EventHandler.NOTIFICATION_ONLY.get(ENV.event_type)
+    if notification and not getattr(cfg.notifications, notification):
+        log.info("%s notifications disabled. Skipping.", ENV.event_type.value)
+        sys.exit(0)
+
+    kodi = LibraryManager(cfg.hosts, cfg.library.path_mapping)
 
     if not kodi.hosts:
         log.critical("Unable to modify library. No active Kodi Hosts.")
         kodi.dispose_hosts()
         return
 
-    match ENV.event_type:
-        case Events.ON_GRAB:
-            event_handler.grab()
-        case Events.ON_DOWNLOAD:
-            if ENV.is_upgrade:
-                event_handler.download_upgrade()
-            else:
-                event_handler.download_new()
-        case Events.ON_RENAME:
-            event_handler.rename()
-        case Events.ON_DELETE:
-            event_handler.episode_delete()
-        case Events.ON_SERIES_ADD:
-            event_handler.series_add()
-        case Events.ON_SERIES_DELETE:
-            event_handler.series_delete()
-        case Events.ON_HEALTH_ISSUE:
-            event_handler.health_issue()
-        case Events.ON_HEALTH_RESTORED:
-            event_handler.health_restored()
-        case Events.ON_APPLICATION_UPDATE:
-            event_handler.application_update()
-        case Events.ON_MANUAL_INTERACTION_REQUIRED:
-            event_handler.manual_interaction_required()
-        case Events.ON_TEST:
-            event_handler.test()
-        case _:
-            log.critical("Event type was unknown or could not be parsed. Exiting")
-            kodi.dispose_hosts()
-            sys.exit(1)
+    handler = EventHandler.DISPATCH.get(ENV.event_type)
+    if not handler:
+        log.critical("Event type was unknown or could not be parsed. Exiting")
+        kodi.dispose_hosts()
+        sys.exit(1)
+
+    handler(EventHandler(ENV, cfg, kodi))
 
     log.info("Processing Complete")
     kodi.dispose_hosts()
@@ -1,43 +1,33 @@
 """Sonarr Kodi"""
 
+import functools
 import logging
 import logging.config
 from pathlib import Path
 from .config import ConfigParser
 from .environment import Events, ENV
-from .kodi import LibraryManager
-from .event_handler import EventHandler
 from .config.models import LogCfg
 
-__all__ = ["ConfigParser", "LibraryManager", "Events", "ENV", "EventHandler"]
+__all__ = ["ConfigParser", "Events", "ENV"]
 
+LOG_FILE_NAME = "Sonarr_Kodi.txt"
+SONARR_LOG_DIR = Path("/config/logs")
+PACKAGE_LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 
+@functools.cache
 def _get_log_path() -> str:
-    """Determine where to store logs"""
-    file_path = "/config/logs"
-    file_name = "Sonarr_Kodi.txt"
-
-    if not Path(file_path).exists():
+    """Determine where to store logs. Resolved once per process"""
+    if not SONARR_LOG_DIR.exists():
         # Create and return a /logs directory within this package
-        log_dir = Path(__file__).resolve().parent.parent / "logs"
-        if not log_dir.exists():
-            log_dir.mkdir()
-        return str(Path(log_dir, file_name))
+        PACKAGE_LOG_DIR.mkdir(exist_ok=True)
+        return str(PACKAGE_LOG_DIR / LOG_FILE_NAME)
 
     # Return the default Sonarr logs directory
-    return str(Path(file_path, file_name))
+    return str(SONARR_LOG_DIR / LOG_FILE_NAME)
 
 
 def config_log(log_cfg: LogCfg) -> None:
     """Configure logging"""
-    file_handler = {
-        "class": "logging.handlers.RotatingFileHandler",
-        "level": log_cfg.level,
-        "formatter": "file",
-        "filename": _get_log_path(),
-        "maxBytes": 1_000_000,
-        "backupCount": 5,
-    }
     default_config = {
         "version": 1,
         "disable_existing_loggers": True,
@@ -60,13 +50,26 @@ def config_log(log_cfg: LogCfg) -> None:
         "loggers": {
             "root": {
                 "handlers": ["console"],
-                "level": "DEBUG",
             }
         },
     }
 
+    # Only resolve (and possibly create) the log directory when writing to file
     if log_cfg.write_file:
-        default_config["handlers"]["file"] = file_handler
+        default_config["handlers"]["file"] = {
+            "class": "logging.handlers.RotatingFileHandler",
+            "level": log_cfg.level,
+            "formatter": "file",
+            "filename": _get_log_path(),
+            "maxBytes": 1_000_000,
+            "backupCount": 5,
+        }
         default_config["loggers"]["root"]["handlers"].append("file")
 
+    # Root level follows the most verbose handler so suppressed records are never created
+    root_level = logging.WARNING
+    if log_cfg.write_file:
+        root_level = min(root_level, logging.getLevelName(log_cfg.level))
+    default_config["loggers"]["root"]["level"] = logging.getLevelName(root_level)
+
     logging.config.dictConfig(default_config)
@@ -1,11 +1,22 @@
 """Sonarr Kodi Configuration Manager"""
 
-import ipaddress
+import functools
+import json
+import os
+import pickle
+import socket
+import tempfile
 from pathlib import Path
-import yaml
-from .models import Config, LogLevels
+from typing import Callable
+from .models import Config, LogLevels, LOG_LEVEL_VALUES
 from .exceptions import ConfigError
 
+DEFAULT_CFG_PATH = Path(__file__).with_name("default_config.yaml")
+DEFAULT_CFG_CACHE = DEFAULT_CFG_PATH.with_suffix(".json")
+
+# Stored with compiled configs. Bump whenever the Config models change shape, even if CONFIG_SCHEMA does not
+CACHE_VERSION = 1
+
 CONFIG_SCHEMA = {
     "logs": {
         "level": str,
@@ -33,6 +44,7 @@ CONFIG_SCHEMA = {
         "on_health_restored": bool,
         "on_application_update": bool,
         "on_manual_interaction_required": bool,
+        "on_test": bool,
     },
     "hosts": [
         {
@@ -49,75 +61,212 @@ CONFIG_SCHEMA = {
 }
 
 
+# Fields that may be omitted from the config
+OPTIONAL_FIELDS = {"path_mapping"}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a uniquely named temp file, so concurrent runs never read a partial file
+
+    Args:
+        path (Path): Destination file
+        data (bytes): File contents
+
+    Raises:
+        OSError: The file could not be written
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as file:
+        tmp_path = Path(file.name)
+        try:
+            file.write(data)
+        except OSError:
+            file.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _check_log_level(value: str, path: str, indices: list[int]) -> None:
+    """Validate log.level field"""
+    if value.upper() not in LOG_LEVEL_VALUES:
+        opts = ", ".join(LogLevels.values())
+        raise ConfigError(f"Invalid value for '{path.format(*indices)}', options: {opts}, got {value}")
+
+
+def _check_ip_addr(value: str, path: str, indices: list[int]) -> None:
+    """Validate host[x].ip_addr field"""
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, value)
+            return
+        except (OSError, ValueError):
+            continue
+
+    raise ConfigError(f"Invalid value for '{path.format(*indices)}' got {value}")
+
+
+def _check_port(value: int, path: str, indices: list[int]) -> None:
+    """Validate host[x].port field"""
+    if value < 0 or value > 65535:
+        raise ConfigError(f"Invalid value for '{path.format(*indices)}' got {value}. Must be between 0-65535")
+
+
+# Value checks applied to a field once its type is validated
+FIELD_CHECKS = {
+    "level": _check_log_level,
+    "ip_addr": _check_ip_addr,
+    "port": _check_port,
+}
+
+
+def _compile_schema(schema: dict, prefix: str = "") -> Callable[[dict, list[int]], None]:
+    """Build a validator specialized to a schema. The schema is walked once here,
+    leaving only direct key lookups and type checks when a config is validated.
+
+    Args:
+        schema (dict): The schema to validate against
+        prefix (str, optional): Path of the enclosing schema. Defaults to "".
+
+    Returns:
+        Callable[[dict, list[int]], None]: Validator accepting a config and a stack of enclosing list indices
+    """
+    validators = [_compile_field(key, expected_type, prefix + key) for key, expected_type in schema.items()]
+
+    def validate(config: dict, indices: list[int]) -> None:
+        for validator in validators:
+            validator(config, indices)
+
+    return validate
+
+
+def _compile_field(key: str, expected_type: type | dict | list, path: str) -> Callable[[dict, list[int]], None]:
+    """Build a validator for a single schema entry.
+
+    Args:
+        key (str): The key to validate
+        expected_type (type | dict | list): Expected type, nested schema or list containing an item schema
+        path (str): Dotted path to the key. Contains a '{}' placeholder for each enclosing list index
+
+    Returns:
+        Callable[[dict, list[int]], None]: Validator accepting the parent dict and a stack of enclosing list indices
+    """
+    if isinstance(expected_type, dict):
+        # Nested dictionaries
+        check_value = _compile_schema(expected_type, path + ".")
+
+    elif isinstance(expected_type, list):
+        # Validate each item in the list against the item schema
+        check_item = _compile_schema(expected_type[0], path + ".[{}].")
+
+        def check_value(value: list, indices: list[int]) -> None:
+            if not isinstance(value, list):
+                raise ConfigError(f"Expected a list for '{path.format(*indices)}', got {type(value)}.")
+
+            for i, item in enumerate(value):
+                if not isinstance(item, dict):
+                    raise ConfigError(f"Each item in '{path.format(*indices)}' list must be a dictionary.")
+                indices.append(i)
+                check_item(item, indices)
+                indices.pop()
+
+    else:
+        # Primitive types, optionally followed by a value check
+        field_check = FIELD_CHECKS.get(key)
+
+        def check_value(value: object, indices: list[int]) -> None:
+            if not isinstance(value, expected_type):
+                raise ConfigError(
+                    f"Invalid type for '{path.format(*indices)}', expected {expected_type}, got {type(value)}."
+                )
+            if field_check:
+                field_check(value, path, indices)
+
+    def validate(config: dict, indices: list[int]) -> None:
+        if key not in config:
+            if key in OPTIONAL_FIELDS:
+                return
+            raise ConfigError(f"'{path.format(*indices)}' is missing in the config.")
+        check_value(config[key], indices)
+
+    return validate
+
+
+CONFIG_VALIDATOR = _compile_schema(CONFIG_SCHEMA)
+
+
 class ConfigParser:
     """Parse and validate config files"""
 
     @classmethod
-    def _validate_config(cls, config: dict, schema: dict, path: list[str] = None) -> None:
-        """Validate config based on a schema. This method is called recursively
-        validating each part of the config against the schema.
+    def _validate_config(cls, config: dict) -> None:
+        """Validate config against CONFIG_SCHEMA.
 
         Args:
             config (dict): The config parsed from yaml as a dict
-            schema (dict): The schema to validate against
-            path (list[str], optional): Not used upon initial call. Defaults to None.
 
         Raises:
             ConfigError: Indicating the issue and location
         """
-        if path is None:
-            path = []
-        for key, expected_type in schema.items():
-            current_path = path + [key]
-            current_path_str = ".".join(current_path)
-            if key not in config:
-                if key == "path_mapping":
-                    continue
-                raise ConfigError(f"'{current_path_str}' is missing in the config.")
-
-            actual_value = config[key]
-            if isinstance(expected_type, dict):
-                # Recursive call for nested dictionaries
-                cls._validate_config(actual_value, expected_type, current_path)
-            elif isinstance(expected_type, list):
-                # Validate each item in the list against the schema
-                if not isinstance(actual_value, list):
-                    raise ConfigError(f"Expected a list for '{current_path_str}', got {type(actual_value)}.")
-
-                for i, item in enumerate(actual_value):
-                    if not isinstance(item, dict):
-                        raise ConfigError(f"Each item in '{current_path_str}' list must be a dictionary.")
-                    cls._validate_config(item, expected_type[0], current_path + [f"[{i}]"])
-            else:
-                # Validate primitive types
-                if not isinstance(actual_value, expected_type):
-                    val_type = type(actual_value)
-                    raise ConfigError(
-                        f"Invalid type for '{current_path_str}', expected {expected_type}, got {val_type}."
-                    )
-
-                # Validate log.level field
-                if key == "level":
-                    if actual_value.upper() not in LogLevels.values():
-                        opts = ", ".join(LogLevels.values())
-                        raise ConfigError(
-                            f"Invalid value for '{current_path_str}', options: {opts}, got {actual_value}"
-                        )
-
-                # Validate host[x].ip_addr field
-                if key == "ip_addr":
-                    try:
-                        ipaddress.ip_address(actual_value)
-                    except ValueError as e:
-                        raise ConfigError(f"Invalid value for '{current_path_str}' got {actual_value}") from e
-                    continue
-
-                # Validate host[x].port field
-                if key == "port":
-                    if actual_value < 0 or actual_value > 65535:
-                        raise ConfigError(
-                            f"Invalid value for '{current_path_str}' got {actual_value}. Must be between 0-65535"
-                        )
+        CONFIG_VALIDATOR(config, [])
+
+    @staticmethod
+    def _read_config(config_path: Path) -> dict:
+        """Read and parse a yaml file into a dict.
+
+        Args:
+            config_path (Path): Path to a config file in yaml format
+
+        Raises:
+            ConfigError: If the file could not be read
+
+        Returns:
+            dict: The unvalidated config
+        """
+        # Deferred, yaml is only needed when a file is actually parsed
+        import yaml  # pylint: disable=import-outside-toplevel
+
+        # Prefer the libyaml C binding when available
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        try:
+            # Binary mode, the loader decodes utf-8 itself
+            with open(config_path, mode="rb") as file:
+                return yaml.load(file, Loader=loader)
+        except FileNotFoundError as e:
+            raise ConfigError(f"Config file not found at '{config_path}'") from e
+        except OSError as e:
+            raise ConfigError(f"Failed to read config file. Error: {e}") from e
+
+    @classmethod
+    @functools.cache
+    def _load_default(cls) -> Config:
+        """Load the bundled default config. A pre-parsed json copy is stored beside
+        default_config.yaml and used as long as it is not older than the yaml file.
+
+        Returns:
+            Config: Object containing the default settings
+        """
+        try:
+            if DEFAULT_CFG_CACHE.stat().st_mtime_ns >= DEFAULT_CFG_PATH.stat().st_mtime_ns:
+                with open(DEFAULT_CFG_CACHE, mode="r", encoding="utf8") as file:
+                    return Config.from_dict(json.load(file))
+        except (OSError, ValueError):
+            pass
+
+        # Bundled with this package, no need to validate
+        cfg = cls._read_config(DEFAULT_CFG_PATH)
+
+        # Cache is optional, install directory may be read only
+        try:
+            _write_atomic(DEFAULT_CFG_CACHE, json.dumps(cfg).encode("utf8"))
+        except OSError:
+            pass
+
+        return Config.from_dict(cfg)
 
     def is_default(self, config: Config) -> bool:
         """Checks if a config object is the default.
@@ -128,31 +277,101 @@ class ConfigParser:
         Returns:
             bool: True if the provided config is the default
         """
-        default_cfg_path = Path(__file__).with_name("default_config.yaml")
-        default_cfg = self.get_config(default_cfg_path)
+        return self._load_default() == config
 
-        return default_cfg == config
+    @staticmethod
+    def _load_compiled_config(cache_path: Path, signature: tuple[int, int]) -> Config | None:
+        """Load a previously compiled config if it was built from the same file, schema and CACHE_VERSION.
 
-    def get_config(self, config_path: Path) -> Config:
-        """Parse and validate a config file at the provided path.
+        Args:
+            cache_path (Path): Path to the compiled config
+            signature (tuple[int, int]): The source file's (mtime_ns, size)
+
+        Returns:
+            Config | None: The stored config or None if missing, stale or unreadable
+        """
+        try:
+            with open(cache_path, mode="rb") as file:
+                version, cached_signature, schema, config = pickle.load(file)
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            AttributeError,
+            ImportError,
+            LookupError,
+            TypeError,
+            ValueError,
+        ):
+            # Missing or corrupt, fall back to parsing yaml
+            return None
+
+        if version != CACHE_VERSION or cached_signature != signature or schema != repr(CONFIG_SCHEMA):
+            return None
+
+        return config
+
+    @staticmethod
+    def _store_compiled_config(cache_path: Path, signature: tuple[int, int], config: Config) -> None:
+        """Store a validated config for reuse by later runs. Failures are ignored.
 
         Args:
-            config_path (Path): Path to a config file in yaml format
+            cache_path (Path): Path to the compiled config
+            signature (tuple[int, int]): The source file's (mtime_ns, size)
+            config (Config): The validated config
+        """
+        data = pickle.dumps((CACHE_VERSION, signature, repr(CONFIG_SCHEMA), config), protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            _write_atomic(cache_path, data)
+        except OSError:
+            pass
+
+    @classmethod
+    @functools.lru_cache(maxsize=8)
+    def _parse_config(cls, config_path: str, signature: tuple[int, int] | None) -> Config:
+        """Read, validate and parse a config file. Results are cached per path and file signature,
+        in memory and in a compiled copy stored beside the config file.
+
+        Args:
+            config_path (str): Path to a config file in yaml format
+            signature (tuple[int, int] | None): The file's (mtime_ns, size). None if it could not be read.
 
         Returns:
             Config: Object containing all user settings
         """
-        try:
-            with open(config_path, mode="r", encoding="utf8") as file:
-                cfg = yaml.safe_load(file.read())
-        except FileNotFoundError as e:
-            raise ConfigError(f"Config file not found at '{config_path}'") from e
-        except OSError as e:
-            raise ConfigError(f"Failed to read config file. Error: {e}") from e
+        cache_path = Path(config_path + ".cache")
+        if signature:
+            config = cls._load_compiled_config(cache_path, signature)
+            if config:
+                return config
+
+        cfg = cls._read_config(config_path)
 
         try:
-            self._validate_config(cfg, CONFIG_SCHEMA)
+            cls._validate_config(cfg)
         except ConfigError as e:
             raise ConfigError(f"Invalid Config file. Error: {e}") from e
 
-        return Config.from_dict(cfg)
+        config = Config.from_dict(cfg)
+        if signature:
+            cls._store_compiled_config(cache_path, signature, config)
+
+        return config
+
+    def get_config(self, config_path: Path) -> Config:
+        """Parse and validate a config file at the provided path.
+
+        Args:
+            config_path (Path): Path to a config file in yaml format
+
+        Returns:
+            Config: Object containing all user settings
+        """
+        try:
+            stat = Path(config_path).stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Let _read_config report the failure
+            signature = None
+
+        return self._parse_config(str(config_path), signature)
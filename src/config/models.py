@@ -1,6 +1,7 @@
 """Sonarr Kodi Config Models"""
 
-from dataclasses import dataclass, field
+import operator
+from dataclasses import dataclass, field, fields
 from typing import Any, Type, Self, Tuple
 from enum import Enum
 
@@ -20,14 +21,15 @@ class LogLevels(Enum):
 
     @classmethod
     def _missing_(cls, value: object) -> Any:
-        value = value.upper()
-        for member in cls:
-            if member.value == value:
-                return member
-        return None
+        # Values are upper case, retry the lookup case insensitively
+        return _LOG_LEVELS_BY_VALUE.get(str(value).upper())
 
 
-@dataclass
+_LOG_LEVELS_BY_VALUE = {member.value: member for member in LogLevels}
+LOG_LEVEL_VALUES = frozenset(_LOG_LEVELS_BY_VALUE)
+
+
+@dataclass(slots=True, frozen=True)
 class LogCfg:
     """Log Config"""
 
@@ -38,11 +40,15 @@ class LogCfg:
     def from_dict(cls: Type["LogCfg"], data: dict) -> Self:
         """Get Instance from dict values"""
 
-        # Parse into dataclass
-        return cls(level=LogLevels(data["level"]).value, write_file=data["write_file"])
+        # Level values are upper case names, no need to construct the enum
+        level = data["level"].upper()
+        if level not in LOG_LEVEL_VALUES:
+            raise ValueError(f"'{data['level']}' is not a valid LogLevels")
+
+        return cls(level=level, write_file=data["write_file"])
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PathMapping:
     """Sonarr to Host path maps"""
 
@@ -50,7 +56,7 @@ class PathMapping:
     kodi: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LibraryCfg:
     """Library Config"""
 
@@ -65,16 +71,16 @@ class LibraryCfg:
     def from_dict(cls: Type["LibraryCfg"], data: dict) -> Self:
         """Get Instance from dict values"""
 
-        # Parse into dataclass
-        path_maps = data.pop("path_mapping", None)
-        library_cfg = cls(**data)
-        if path_maps:
-            library_cfg.path_mapping = [PathMapping(**x) for x in path_maps]
+        # Parse into dataclass, path_mapping is optional
+        path_maps = [PathMapping(**x) for x in data.get("path_mapping") or ()]
+        return cls(*LIBRARY_VALUES(data), path_mapping=path_maps)
+
 
-        return library_cfg
+# Extract library settings in field order, for positional construction
+LIBRARY_VALUES = operator.itemgetter(*(x.name for x in fields(LibraryCfg) if x.name != "path_mapping"))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Notifications:
     """Notification Config"""
 
@@ -91,8 +97,17 @@ class Notifications:
     on_manual_interaction_required: bool
     on_test: bool
 
+    @classmethod
+    def from_dict(cls: Type["Notifications"], data: dict) -> Self:
+        """Get Instance from dict values"""
+        return cls(*NOTIFICATION_VALUES(data))
 
-@dataclass
+
+# Extract notification flags in field order, for positional construction
+NOTIFICATION_VALUES = operator.itemgetter(*(x.name for x in fields(Notifications)))
+
+
+@dataclass(slots=True, frozen=True)
 class HostConfig:
     """Kodi Host Config"""
 
@@ -104,7 +119,6 @@ class HostConfig:
     enabled: bool
     disable_notifications: bool
     priority: int
-    path_maps: list[PathMapping] = field(default_factory=list)
 
     @property
     def credentials(self) -> Tuple[str, str]:
@@ -114,19 +128,14 @@ class HostConfig:
     @classmethod
     def from_dict(cls: Type["HostConfig"], data: dict) -> Self:
         """Get Instance from dict values"""
-        return cls(
-            name=data["name"],
-            ip_addr=data["ip_addr"],
-            port=data["port"],
-            user=data["user"],
-            password=data["password"],
-            enabled=data["enabled"],
-            disable_notifications=data["disable_notifications"],
-            priority=data["priority"],
-        )
+        return cls(*HOST_VALUES(data))
+
+
+# Extract host settings in field order, for positional construction
+HOST_VALUES = operator.itemgetter(*(x.name for x in fields(HostConfig)))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Config:
     """Configuration Model"""
 
@@ -143,6 +152,6 @@ class Config:
         return cls(
             logs=LogCfg.from_dict(data["logs"]),
             library=LibraryCfg.from_dict(data["library"]),
-            notifications=Notifications(**data["notifications"]),
-            hosts=[HostConfig.from_dict(x) for x in data["hosts"]],
+            notifications=Notifications.from_dict(data["notifications"]),
+            hosts=list(map(HostConfig.from_dict, data["hosts"])),
         )
@@ -1,9 +1,13 @@
 """Sonarr Environment parser"""
 from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import get_args, get_origin, Any
+from functools import cached_property
+from typing import get_args, get_origin, Any, Callable
 from os import environ
 
+# Casings Sonarr uses for its environment variables, checked without lowercasing every key
+ENV_PREFIXES = ("sonarr_", "Sonarr_", "SONARR_")
+
 
 class Events(Enum):
     """Sonarr Events"""
@@ -23,11 +27,30 @@ class Events(Enum):
 
     @classmethod
     def _missing_(cls, value: object) -> Any:
-        value = value.upper()
-        for member in cls:
-            if member.value.upper() == value:
-                return member
-        return cls.UNKNOWN
+        return _EVENTS_BY_UPPER.get(str(value).upper(), cls.UNKNOWN)
+
+
+# Case-insensitive lookup for Events._missing_
+_EVENTS_BY_UPPER = {member.value.upper(): member for member in Events}
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment value"""
+    normalized = value.strip().lower()
+    if normalized == "true":
+        return True
+    if normalized == "false":
+        return False
+
+    raise ValueError(f"Failed to parse '{value}' to a boolean")
+
+
+def _parse_int(value: str) -> int:
+    """Parse an integer environment value"""
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Failed to parse {value} to int") from None
 
 
 @dataclass
@@ -55,65 +78,62 @@ class SonarrEnvironment:
     health_issue_msg: str = field(default=None, metadata={"var": "Sonarr_Health_Issue_Message"})
     health_restored_msg: str = field(default=None, metadata={"var": "Sonarr_Health_Restored_Message"})
     update_message: str = field(default=None, metadata={"var": "Sonarr_Update_Message"})
-    raw_vars: dict = field(default=None, repr=False)
 
-    @classmethod
-    def _parse_bool(cls, value: str) -> bool:
-        if isinstance(value, str):
-            if value.lower().strip() == "true":
-                return True
-            if value.lower().strip() == "false":
-                return False
+    @cached_property
+    def raw_vars(self) -> dict[str, str]:
+        """All Sonarr environment variables keyed by lower case name. Only built when requested"""
+        return {k.lower().strip(): v for k, v in environ.items() if k.startswith(ENV_PREFIXES)}
 
-        raise ValueError(f"Failed to parse '{value}' to a boolean")
+    def __post_init__(self) -> None:
+        # Look up each field's variable directly instead of scanning the whole environment
+        for name, var_names, parser in _FIELDS:
+            value = None
+            for var_name in var_names:
+                value = environ.get(var_name)
+                if value:
+                    break
+            if not value:
+                continue
 
-    @classmethod
-    def _parse_int(cls, value: str) -> int:
-        if isinstance(value, str):
-            try:
-                return int(value.strip())
-            except ValueError:
-                pass
+            setattr(self, name, parser(value))
 
-        raise ValueError(f"Failed to parse {value} to int")
 
-    def __post_init__(self) -> None:
-        # Get environment variables
-        self.raw_vars = {k.lower().strip(): v for k, v in environ.items() if k.lower().startswith("sonarr")}
+def _get_parser(attr_type: Any) -> Callable[[str], Any]:
+    """Select the parser for a field type"""
+    # Handle lists
+    if get_origin(attr_type) == list:
+        list_type = get_args(attr_type)[0]
 
-        # Loop through dataclass fields
-        for attr in fields(self):
-            var_name = attr.metadata.get("var")
-            if not var_name:
-                continue
+        # List of strings
+        if issubclass(list_type, str):
+            return lambda value: list(map(str.strip, value.split("|")))
 
-            value = self.raw_vars.get(var_name.lower())
-            if not value:
-                continue
+        # List of integers
+        if issubclass(list_type, int):
+            return lambda value: list(map(_parse_int, value.split(",")))
 
-            # Based on attribute type, store this environment variable's value
-            if issubclass(attr.type, Events):
-                self.__setattr__(attr.name, Events(value))
+    elif issubclass(attr_type, Events):
+        return Events
 
-            elif issubclass(attr.type, str):
-                self.__setattr__(attr.name, value.strip())
+    elif issubclass(attr_type, str):
+        return str.strip
 
-            elif issubclass(attr.type, bool):
-                self.__setattr__(attr.name, self._parse_bool(value))
+    elif issubclass(attr_type, bool):
+        return _parse_bool
 
-            elif issubclass(attr.type, int):
-                self.__setattr__(attr.name, self._parse_int(value))
+    elif issubclass(attr_type, int):
+        return _parse_int
 
-            # Handle lists
-            elif get_origin(attr.type) == list:
-                list_type = get_args(attr.type)[0]
+    raise TypeError(f"No parser for field type {attr_type}")
 
-                # List of strings
-                if issubclass(list_type, str):
-                    value_lst = [x.strip() for x in value.split("|")]
-                    self.__setattr__(attr.name, value_lst)
 
-                # List of integers
-                elif issubclass(list_type, int):
-                    value_lst = [self._parse_int(x) for x in value.split(",")]
-                    self.__setattr__(attr.name, value_lst)
+# Field names paired with the casings of their variable name and a parser, resolved once at import
+_FIELDS = tuple(
+    (
+        attr.name,
+        tuple(dict.fromkeys((attr.metadata["var"], attr.metadata["var"].lower(), attr.metadata["var"].upper()))),
+        _get_parser(attr.type),
+    )
+    for attr in fields(SonarrEnvironment)
+    if attr.metadata.get("var")
+)
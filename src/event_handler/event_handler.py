@@ -1,9 +1,13 @@
 """Sonarr_Kodi Event handler"""
 
+import os
+import time
 import logging
-from datetime import datetime
+from collections import defaultdict
+from datetime import timedelta
+from functools import cached_property
 from pathlib import Path
-from src.environment import SonarrEnvironment
+from src.environment import SonarrEnvironment, Events
 from src.config import Config
 from src.kodi import LibraryManager
 from .exceptions import NFOTimeout
@@ -12,6 +16,10 @@ from .exceptions import NFOTimeout
 class EventHandler:
     """Handles Sonarr Events and deploys Kodi JSON-RPC calls"""
 
+    # Delay between NFO polls starts short and doubles up to the max
+    NFO_POLL_MIN = 0.1
+    NFO_POLL_MAX = 2.0
+
     def __init__(self, env: SonarrEnvironment, cfg: Config, kodi: LibraryManager) -> None:
         self.env = env
         self.cfg = cfg
@@ -19,6 +27,37 @@ class EventHandler:
         self.log = logging.getLogger("EventHandler")
 
     # ------------- Helpers --------------------
+    @cached_property
+    def series_nfo(self) -> Path:
+        """Path to the tvshow.nfo of this event's series"""
+        return Path(self.env.series_path, "tvshow.nfo")
+
+    @cached_property
+    def episode_nfo(self) -> Path:
+        """Path to the NFO of this event's episode file"""
+        return Path(self.env.episode_file_path).with_suffix(".nfo")
+
+    def _scan_nfo_dirs(self, pending: dict[Path, set[str]]) -> None:
+        """List each pending directory once and drop the names found from pending.
+
+        Args:
+            pending (dict[Path, set[str]]): Expected file names grouped by directory. Modified in place.
+        """
+        for directory, names in list(pending.items()):
+            try:
+                with os.scandir(directory) as entries:
+                    found = names.intersection(x.name for x in entries)
+            except OSError:
+                # Directory may not exist yet
+                found = set()
+
+            # record files when they propagate
+            for name in found:
+                self.log.debug("Found %s", name)
+            names -= found
+            if not names:
+                del pending[directory]
+
     def _wait_for_nfos(self, nfos: list[Path], timeout_min: int) -> None:
         """Wait for all files provided to be present in the file system.
 
@@ -29,28 +68,36 @@ class EventHandler:
         Raises:
             NFOTimeout: Contains the elapsed time and missing filenames if timeout_min * len(nfos) exceeded
         """
+        # Group expected names by directory so each poll lists a directory once instead of a stat per file
+        pending: dict[Path, set[str]] = defaultdict(set)
+        for file in nfos:
+            pending[file.parent].add(file.name)
+
+        # NFOs are usually written before Sonarr calls us, check once before starting the wait
+        self._scan_nfo_dirs(pending)
+        if not pending:
+            self.log.info("All required NFO files already present.")
+            return
+
         max_sec = (timeout_min * len(nfos)) * 60
         self.log.info("Waiting up to %s minuets for %s NFO Files.", max_sec / 60, len(nfos))
 
-        files_found = set()
-        start = datetime.now()
-        while len(nfos) > len(files_found):
-            elapsed = datetime.now() - start
-
-            for file in nfos:
-                # skip files already found
-                if file in files_found:
-                    continue
-
-                # record files when they propagate
-                if file.exists():
-                    self.log.debug("Found %s", file.name)
-                    files_found.add(file)
-
-                # return false if we timed out
-                if elapsed.total_seconds() >= max_sec:
-                    raise NFOTimeout(elapsed_time=elapsed, missing_nfos=[x for x in nfos if x not in files_found])
-
+        start = time.monotonic()
+        deadline = start + max_sec
+        delay = self.NFO_POLL_MIN
+        while pending:
+            # raise if we timed out
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                missing = [x for x in nfos if x.name in pending.get(x.parent, ())]
+                raise NFOTimeout(elapsed_time=timedelta(seconds=time.monotonic() - start), missing_nfos=missing)
+
+            # Back off between passes, never sleeping past the deadline
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.NFO_POLL_MAX)
+            self._scan_nfo_dirs(pending)
+
+        elapsed = timedelta(seconds=time.monotonic() - start)
         self.log.info("All required NFO files were found after %s.", elapsed)
 
     # ------------- Events -------------------------
@@ -63,43 +110,60 @@ class EventHandler:
             self.log.info("Grab notifications disabled. Skipping.")
             return
 
+        # Nothing to do when no host accepts notifications
+        if not self.kodi.notify_hosts:
+            self.log.info("All hosts have notifications disabled. Skipping.")
+            return
+
         # Send notification for each attempted download
+        env = self.env
         title = "Sonarr - Attempting Download"
-        for ep_num, ep_title in zip(self.env.release_episode_numbers, self.env.release_episode_titles):
-            msg = f"{self.env.series_title} - S{self.env.release_season_number:02}E{ep_num:02} - {ep_title}"
-            self.kodi.notify(title=title, msg=msg)
+        prefix = f"{env.series_title} - S{env.release_season_number:02}E"
+        episodes = zip(env.release_episode_numbers, env.release_episode_titles)
+        msgs = [f"{prefix}{ep_num:02} - {ep_title}" for ep_num, ep_title in episodes]
+        self.kodi.notify_many(title=title, msgs=msgs)
+
+    def download(self) -> None:
+        """Downloaded an episode file"""
+        if self.env.is_upgrade:
+            self.download_upgrade()
+        else:
+            self.download_new()
 
     def download_new(self) -> None:
         """Downloaded a new episode"""
         self.log.info("Download New Episode Event Detected")
+        lib = self.cfg.library
+        series_path = self.env.series_path
         new_episodes = []
 
+        # Look up the show while NFO files generate
+        existing_shows = self.kodi.submit(self.kodi.show_exists, series_path)
+
         # optionally, wait for NFO files to generate
-        if self.cfg.library.wait_for_nfo:
-            ep_nfo = Path(self.env.episode_file_path).with_suffix(".nfo")
-            show_nfo = Path(self.env.series_path).joinpath("tvshow.nfo")
+        if lib.wait_for_nfo:
             try:
-                self._wait_for_nfos([ep_nfo, show_nfo], self.cfg.library.nfo_timeout_minuets)
+                self._wait_for_nfos([self.episode_nfo, self.series_nfo], lib.nfo_timeout_minuets)
             except NFOTimeout as e:
                 self.log.critical("Failed to find NFOs. %s", e)
                 return
 
         # New Show, perform full scan
-        if not self.kodi.show_exists(self.env.series_path):
+        if not existing_shows.result():
             self.log.info("New Show Detected, Full scan required.")
-            new_episodes = self.kodi.full_scan(skip_active=self.cfg.library.skip_active)
+            new_episodes = self.kodi.full_scan(skip_active=lib.skip_active)
 
         # Existing show, try scanning directory. Maybe fallback to full scan
         else:
             self.log.info("Existing Show Detected, Performing directory scan.")
-            new_episodes = self.kodi.scan_directory(self.env.series_path, skip_active=self.cfg.library.skip_active)
-            if not new_episodes and self.cfg.library.full_scan_fallback:
+            new_episodes = self.kodi.scan_directory(series_path, skip_active=lib.skip_active)
+            if not new_episodes and lib.full_scan_fallback:
                 self.log.info("No new episodes found during folder scan. Falling back to Full Scan.")
-                new_episodes = self.kodi.full_scan(skip_active=self.cfg.library.skip_active)
+                new_episodes = self.kodi.full_scan(skip_active=lib.skip_active)
 
         # Optionally, Clean Library
-        if self.cfg.library.clean_after_update:
-            self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
+        if lib.clean_after_update:
+            self.kodi.clean_library(skip_active=lib.skip_active)
 
         if not new_episodes:
             self.log.warning("No episodes were scanned into library. Exiting.")
@@ -117,51 +181,45 @@ class EventHandler:
 
         # Notify clients
         title = "Sonarr - Downloaded New Episode"
-        for episode in new_episodes:
-            self.kodi.notify(title=title, msg=episode)
+        self.kodi.notify_many(title=title, msgs=new_episodes)
 
     def download_upgrade(self) -> None:
         """Downloaded an upgraded episode file"""
         self.log.info("Upgrade Episode Event Detected")
+        lib = self.cfg.library
+        series_path = self.env.series_path
 
-        # Store library data for replaced episodes and remove those entries
-        removed_episodes = []
-        for path in self.env.deleted_paths:
-            old_eps = self.kodi.get_episodes_by_file(path)
-            for ep in old_eps:
-                if self.kodi.remove_episode(ep):
-                    removed_episodes.append(ep)
+        # Store library data for replaced episodes and remove those entries while NFO files generate
+        old_eps = self.kodi.get_episodes_by_files(self.env.deleted_paths)
+        removal = self.kodi.submit(self.kodi.remove_episodes, old_eps)
 
         # optionally, wait for NFO files to generate
-        if self.cfg.library.wait_for_nfo:
-            ep_nfo = Path(self.env.episode_file_path).with_suffix(".nfo")
-            show_nfo = Path(self.env.series_path).joinpath("tvshow.nfo")
+        if lib.wait_for_nfo:
             try:
-                self._wait_for_nfos([ep_nfo, show_nfo], self.cfg.library.nfo_timeout_minuets)
+                self._wait_for_nfos([self.episode_nfo, self.series_nfo], lib.nfo_timeout_minuets)
             except NFOTimeout as e:
                 self.log.critical("Failed to find NFOs. %s", e)
                 return
 
+        removed_episodes = removal.result()
+
         # Force library clean if manual removal failed
         if not removed_episodes:
             self.log.warning("Failed to remove old episodes. Unable to persist watched states. Cleaning Required.")
-            if not self.cfg.library.clean_after_update:
-                self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
+            if not lib.clean_after_update:
+                self.kodi.clean_library(skip_active=lib.skip_active)
 
         # Scan show directory and fall back to full scan if configured
-        new_episodes = self.kodi.scan_directory(self.env.series_path, skip_active=self.cfg.library.skip_active)
-        if not new_episodes and self.cfg.library.full_scan_fallback:
-            new_episodes = self.kodi.full_scan(skip_active=self.cfg.library.skip_active)
+        new_episodes = self.kodi.scan_directory(series_path, skip_active=lib.skip_active)
+        if not new_episodes and lib.full_scan_fallback:
+            new_episodes = self.kodi.full_scan(skip_active=lib.skip_active)
 
         # Optionally, Clean Library
-        if self.cfg.library.clean_after_update:
-            self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
+        if lib.clean_after_update:
+            self.kodi.clean_library(skip_active=lib.skip_active)
 
         # reapply metadata from old library entries
-        for removed_episode in removed_episodes:
-            for new_episode in new_episodes:
-                if removed_episode == new_episode:
-                    self.kodi.copy_ep_metadata(removed_episode, new_episode)
+        self.kodi.copy_metadata(removed_episodes, new_episodes)
 
         # update remaining guis
         self.kodi.update_guis()
@@ -177,57 +235,56 @@ class EventHandler:
 
         # notify clients
         title = "Sonarr - Upgraded Episode"
-        for episode in new_episodes:
-            self.kodi.notify(title=title, msg=episode)
+        self.kodi.notify_many(title=title, msgs=new_episodes)
 
     def rename(self) -> None:
         """Renamed an episode file"""
         self.log.info("File Rename Event Detected")
+        lib = self.cfg.library
+        series_path = self.env.series_path
 
         # Store library data for replaced episodes and remove those entries
-        removed_episodes = []
-        for path in self.env.episode_file_previous_paths:
-            old_eps = self.kodi.get_episodes_by_file(path)
-            for ep in old_eps:
-                # Stop Player
-                self.kodi.stop_playback(ep, reason="Rename in progress. Please wait...")
+        old_eps = self.kodi.get_episodes_by_files(self.env.episode_file_previous_paths)
+
+        # Stop Players
+        for ep in old_eps:
+            self.kodi.stop_playback(ep, reason="Rename in progress. Please wait...")
 
-                # Remove episode from library
-                if self.kodi.remove_episode(ep):
-                    removed_episodes.append(ep)
+        # Remove episodes from library while NFO files generate
+        removal = self.kodi.submit(self.kodi.remove_episodes, old_eps)
 
         # Optionally, wait for nfo files to be created
-        if self.cfg.library.wait_for_nfo:
-            new_files = [Path(self.env.series_path, x) for x in self.env.episode_file_rel_paths]
-            nfos = [x.with_suffix(".nfo") for x in new_files]
-            nfos.append(Path(self.env.series_path, "tvshow.nfo"))
+        if lib.wait_for_nfo:
+            new_files = [Path(series_path, x) for x in self.env.episode_file_rel_paths]
+            # Multi episode files share an NFO, drop duplicates while keeping order
+            nfos = list(dict.fromkeys(x.with_suffix(".nfo") for x in new_files))
+            nfos.append(self.series_nfo)
             try:
-                self._wait_for_nfos(nfos, self.cfg.library.nfo_timeout_minuets)
+                self._wait_for_nfos(nfos, lib.nfo_timeout_minuets)
             except NFOTimeout as e:
                 self.log.critical("Failed to find NFOs. %s", e)
                 return
 
+        removed_episodes = removal.result()
+
         if not removed_episodes:
             self.log.warning("Failed to remove old episodes. Unable to persist watched states. Cleaning Required.")
-            if not self.cfg.library.clean_after_update:
-                self.kodi.clean_library(skip_active=self.cfg.library.skip_active, series_dir=self.env.series_path)
+            if not lib.clean_after_update:
+                self.kodi.clean_library(skip_active=lib.skip_active, series_dir=series_path)
 
         # Scan for new episodes
-        new_episodes = self.kodi.scan_directory(self.env.series_path, skip_active=self.cfg.library.skip_active)
+        new_episodes = self.kodi.scan_directory(series_path, skip_active=lib.skip_active)
 
         # Fall back to full library scan
-        if not new_episodes and self.cfg.library.full_scan_fallback:
-            new_episodes = self.kodi.full_scan(skip_active=self.cfg.library.skip_active)
+        if not new_episodes and lib.full_scan_fallback:
+            new_episodes = self.kodi.full_scan(skip_active=lib.skip_active)
 
         # Optionally, Clean Library
-        if self.cfg.library.clean_after_update:
-            self.kodi.clean_library(self.cfg.library.skip_active)
+        if lib.clean_after_update:
+            self.kodi.clean_library(lib.skip_active)
 
         # Reapply metadata
-        for removed_episode in removed_episodes:
-            for new_episode in new_episodes:
-                if removed_episode == new_episode:
-                    self.kodi.copy_ep_metadata(removed_episode, new_episode)
+        self.kodi.copy_metadata(removed_episodes, new_episodes)
 
         # Update GUIs
         self.kodi.update_guis()
@@ -243,38 +300,39 @@ class EventHandler:
 
         # Notify clients
         title = "Sonarr - Renamed Episode"
-        for episode in new_episodes:
-            self.kodi.notify(title=title, msg=episode)
+        self.kodi.notify_many(title=title, msgs=new_episodes)
 
     def episode_delete(self) -> None:
         """Remove an episode"""
         self.log.info("Delete File Event Detected")
+        lib = self.cfg.library
 
         # Upgrades only. Stop playback and store data for restart after sonarr replaces file
-        if self.env.episode_file_delete_reason.lower() == "upgrade":
+        delete_reason = (self.env.episode_file_delete_reason or "").lower()
+        if delete_reason == "upgrade":
             # Stop episodes that are currently playing
             for old_ep in self.kodi.get_episodes_by_file(self.env.episode_file_path):
                 self.kodi.stop_playback(old_ep, reason="Processing Upgrade. Please Wait...")
             return
 
         # Store library data for removed episodes and remove those entries
-        removed_episodes = []
-        for old_ep in self.kodi.get_episodes_by_file(self.env.episode_file_path):
-            # Stop Player
+        old_eps = self.kodi.get_episodes_by_file(self.env.episode_file_path)
+
+        # Stop Players
+        for old_ep in old_eps:
             self.kodi.stop_playback(old_ep, reason="Deleted Episode")
 
-            # Remove episode from library
-            if self.kodi.remove_episode(old_ep):
-                removed_episodes.append(old_ep)
+        # Remove episodes from library
+        removed_episodes = self.kodi.remove_episodes(old_eps)
 
         if not removed_episodes:
             self.log.warning("Failed to remove any old episodes. Cleaning Required.")
-            if not self.cfg.library.clean_after_update:
-                self.kodi.clean_library(skip_active=self.cfg.library.skip_active, series_dir=self.env.series_path)
+            if not lib.clean_after_update:
+                self.kodi.clean_library(skip_active=lib.skip_active, series_dir=self.env.series_path)
 
         # Optionally, Clean Library
-        if self.cfg.library.clean_after_update:
-            self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
+        if lib.clean_after_update:
+            self.kodi.clean_library(skip_active=lib.skip_active)
 
         # Update remaining guis
         self.kodi.update_guis()
@@ -286,8 +344,7 @@ class EventHandler:
 
         # Notify clients
         title = "Sonarr - Deleted Episode"
-        for episode in removed_episodes:
-            self.kodi.notify(title=title, msg=episode)
+        self.kodi.notify_many(title=title, msgs=removed_episodes)
 
     def series_add(self) -> None:
         """Adding a Series"""
@@ -312,7 +369,7 @@ class EventHandler:
             episodes = self.kodi.get_episodes_by_dir(self.env.series_path)
             for ep in episodes:
                 self.kodi.stop_playback(ep, "Series deleted", False)
-                self.kodi.remove_episode(ep)
+            self.kodi.remove_episodes(episodes)
 
             # Remove Show
             self.kodi.remove_show(self.env.series_path)
@@ -405,3 +462,29 @@ class EventHandler:
         title = "Sonarr - Testing"
         msg = "Test Passed"
         self.kodi.notify(title=title, msg=msg)
+
+    # Handler for each Sonarr event type. Called with an EventHandler instance
+    DISPATCH = {
+        Events.ON_GRAB: grab,
+        Events.ON_DOWNLOAD: download,
+        Events.ON_RENAME: rename,
+        Events.ON_DELETE: episode_delete,
+        Events.ON_SERIES_ADD: series_add,
+        Events.ON_SERIES_DELETE: series_delete,
+        Events.ON_HEALTH_ISSUE: health_issue,
+        Events.ON_HEALTH_RESTORED: health_restored,
+        Events.ON_APPLICATION_UPDATE: application_update,
+        Events.ON_MANUAL_INTERACTION_REQUIRED: manual_interaction_required,
+        Events.ON_TEST: test,
+    }
+
+    # Events that only send a notification, mapped to the Notifications flag enabling it
+    NOTIFICATION_ONLY = {
+        Events.ON_GRAB: "on_grab",
+        Events.ON_SERIES_ADD: "on_series_add",
+        Events.ON_HEALTH_ISSUE: "on_health_issue",
+        Events.ON_HEALTH_RESTORED: "on_health_restored",
+        Events.ON_APPLICATION_UPDATE: "on_application_update",
+        Events.ON_MANUAL_INTERACTION_REQUIRED: "on_manual_interaction_required",
+        Events.ON_TEST: "on_test",
+    }
@@ -1,4 +1,5 @@
 """Event handler exceptions"""
+from operator import attrgetter
 from pathlib import Path
 from datetime import timedelta
 
@@ -12,5 +13,5 @@ class NFOTimeout(Exception):
         self.elapsed_time: timedelta = elapsed_time
 
     def __str__(self) -> str:
-        nfo_str = ", ".join([x.name for x in self.missing_nfos])
+        nfo_str = ", ".join(map(attrgetter("name"), self.missing_nfos))
         return f"NFO Timeout. Waited for {self.elapsed_time}. Still missing [{nfo_str}]"
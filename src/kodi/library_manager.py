@@ -2,8 +2,12 @@
 
 import logging
 import pickle
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from time import sleep
+from typing import Any, Callable
 from src.config.models import HostConfig, PathMapping
 from .rpc_client import KodiRPC
 from .models import EpisodeDetails, StoppedEpisode, ShowDetails
@@ -20,9 +24,31 @@ class LibraryManager:
     def __init__(self, host_configs: list[HostConfig], path_maps: list[PathMapping]) -> None:
         self.log = logging.getLogger("Kodi-Library-Manager")
         self.log.debug("Building list of Kodi Hosts")
-        self.hosts: list[KodiRPC] = [self._create_host(cfg, path_maps) for cfg in host_configs if cfg.enabled]
+        self.hosts: list[KodiRPC] = self._create_hosts([cfg for cfg in host_configs if cfg.enabled], path_maps)
+        # Shared pool for independent per-host calls. Threads are only spawned on first use
+        self._pool = ThreadPoolExecutor(max_workers=max(len(self.hosts), 1))
+        # Library query results for the life of this process. Cleared whenever the library is changed
+        self._query_cache: dict[tuple, Any] = {}
 
-    def _create_host(self, cfg: HostConfig, path_maps: list[PathMapping]) -> KodiRPC:
+    def _create_hosts(self, host_configs: list[HostConfig], path_maps: list[PathMapping]) -> list[KodiRPC]:
+        """Create KodiRPC instances, testing all connections concurrently. Order of host_configs is preserved.
+
+        Args:
+            host_configs (list[HostConfig]): Enabled host configs
+            path_maps (list[PathMapping]): Path mappings passed to each host
+
+        Returns:
+            list[KodiRPC]: Hosts that responded
+        """
+        if not host_configs:
+            return []
+
+        with ThreadPoolExecutor(max_workers=len(host_configs)) as pool:
+            hosts = list(pool.map(lambda cfg: self._create_host(cfg, path_maps), host_configs))
+
+        return [host for host in hosts if host]
+
+    def _create_host(self, cfg: HostConfig, path_maps: list[PathMapping]) -> KodiRPC | None:
         """Create a new KodiRPC instance and return it if connection is successful"""
         host = KodiRPC(
             name=cfg.name,
@@ -30,29 +56,34 @@ class LibraryManager:
             port=cfg.port,
             user=cfg.user,
             password=cfg.password,
+            disable_notifications=cfg.disable_notifications,
+            priority=cfg.priority,
             path_maps=[{"sonarr": x.sonarr, "kodi": x.kodi} for x in path_maps],
         )
         self.log.debug("Testing connection with %s", cfg.name)
         if host.is_alive:
             self.log.info("Connection established with: %s", host)
             return host
+
+        host.close_session()
         return None
 
     def dispose_hosts(self) -> None:
         """Close all sessions in all hosts"""
+        self._pool.shutdown()
         for host in self.hosts:
             host.close_session()
 
+    @property
+    def notify_hosts(self) -> list[KodiRPC]:
+        """All Kodi Hosts with notifications enabled"""
+        return [x for x in self.hosts if not x.disable_notifications]
+
     @property
     def hosts_not_scanned(self) -> list[KodiRPC]:
         """All Kodi Hosts that were not scanned"""
         return [x for x in self.hosts if not x.library_scanned]
 
-    @property
-    def hosts_not_playing(self) -> list[KodiRPC]:
-        """list of hosts not currently playing"""
-        return [x for x in self.hosts if not x.is_playing]
-
     # -------------- Helpers -----------------------
     def _serialize(self, stopped_eps: list[StoppedEpisode]) -> None:
         """Serialize and store list of stopped episodes
@@ -84,6 +115,15 @@ class LibraryManager:
 
         return data
 
+    def _first_result(self, query: Callable[[KodiRPC, str], list], path: str) -> list:
+        """Run a library query against each host in turn, returning the first non-empty result"""
+        for host in self.hosts:
+            result = query(host, path)
+            if result:
+                return result
+
+        return []
+
     def _get_all_episodes(self) -> list[EpisodeDetails]:
         """Get all episodes from library. This is a SQL expensive operation"""
         self.log.info("Getting all episodes. This may take a moment.")
@@ -94,17 +134,58 @@ class LibraryManager:
 
         return []
 
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run a call on the shared pool, so it overlaps with other work. Pending calls finish before
+        dispose_hosts closes the sessions. fn must not wait on the pool itself.
+
+        Args:
+            fn (Callable[..., Any]): The call to run, usually a method of this LibraryManager
+            *args (Any): Arguments passed to fn
+
+        Returns:
+            Future: Result of the call
+        """
+        return self._pool.submit(fn, *args)
+
+    # -------------- Query Cache -------------------
+    def _cached(self, key: tuple, query: Callable[[], list]) -> list:
+        """Return the cached result of a library query, running the query only on a miss. Empty results are
+        not cached, hosts also return an empty list when the request failed.
+
+        Args:
+            key (tuple): Identifies the query and its argument
+            query (Callable[[], list]): Queries the hosts
+
+        Returns:
+            list: A copy of the query result
+        """
+        if key in self._query_cache:
+            self.log.debug("Using cached library query %s", key)
+            return list(self._query_cache[key])
+
+        result = query()
+        if result:
+            self._query_cache[key] = result
+
+        return list(result)
+
+    def _invalidate_cache(self) -> None:
+        """Forget all cached library queries. Called after anything that changes the library"""
+        self._query_cache.clear()
+
     # -------------- GUI Methods -------------------
     def update_guis(self) -> None:
         """Update GUI for all hosts not scanned"""
-        for host in self.hosts_not_scanned:
-            host.update_gui()
+        list(self._pool.map(KodiRPC.update_gui, self.hosts_not_scanned))
 
     def notify(self, title: str, msg: str) -> None:
         """Send notification to all enabled hosts"""
+        list(self._pool.map(lambda host: host.notify(title, msg), self.notify_hosts))
 
-        for host in self.hosts:
-            host.notify(title, msg)
+    def notify_many(self, title: str, msgs: list[str]) -> None:
+        """Send many notifications to all enabled hosts, one batch per host"""
+        if msgs:
+            list(self._pool.map(lambda host: host.notify_many(title, msgs), self.notify_hosts))
 
     # -------------- Player Methods ----------------
     def stop_playback(self, episode: EpisodeDetails, reason: str, store_result: bool = True) -> None:
@@ -116,34 +197,18 @@ class LibraryManager:
             store_result (bool, optional): True when the intent is to restart later. Defaults to True.
         """
         title = "Sonarr - Stopped Playback"
-        stopped_episodes: list[StoppedEpisode] = []
-
-        # Loop through players, get episode_id and player_id
-        for host in self.hosts:
-            for player in host.active_players:
-                item = host.get_player_item(player.player_id)
 
-                # Skip if not an episode
-                if item and item.type.lower() != "episode":
-                    continue
-
-                # Skip if not the episode we are looking for
-                if item.item_id != episode.episode_id:
-                    continue
-
-                # Stop the player and collect position, paused state
-                self.log.info("%s Stopping playback of %s", host.name, episode)
-                paused = host.is_paused(player.player_id)
-                position = host.player_percent(player.player_id)
-                host.stop_player(player.player_id)
-                stopped_episodes.append(
-                    StoppedEpisode(episode=episode, host_name=host.name, position=position, paused=paused)
-                )
+        # Inspect and stop players on all hosts concurrently
+        results = self._pool.map(self._stop_on_host, self.hosts, repeat(episode))
+        stopped_episodes = [stopped_ep for stopped in results for stopped_ep in stopped]
 
         # Return early if nothing was stopped on any host
         if not stopped_episodes:
             return
 
+        # Stopping updates resume points of cached episodes
+        self._invalidate_cache()
+
         # Store results of stopped episodes
         if store_result:
             self._serialize(stopped_episodes)
@@ -158,6 +223,41 @@ class LibraryManager:
                     continue
                 host.notify(title, reason, force=True)
 
+    def _stop_on_host(self, host: KodiRPC, episode: EpisodeDetails) -> list[StoppedEpisode]:
+        """Stop all players of a single host that are playing the given episode
+
+        Args:
+            host (KodiRPC): The host to inspect
+            episode (EpisodeDetails): The episode to stop
+
+        Returns:
+            list[StoppedEpisode]: Details of each stopped player
+        """
+        stopped_episodes: list[StoppedEpisode] = []
+
+        # Loop through players, get episode_id and player_id
+        for player in host.active_players:
+            item = host.get_player_item(player.player_id)
+
+            # Skip if unknown or not an episode
+            if not item or item.type.lower() != "episode":
+                continue
+
+            # Skip if not the episode we are looking for
+            if item.item_id != episode.episode_id:
+                continue
+
+            # Stop the player and collect position, paused state
+            self.log.info("%s Stopping playback of %s", host.name, episode)
+            paused = host.is_paused(player.player_id)
+            position = host.player_percent(player.player_id)
+            host.stop_player(player.player_id)
+            stopped_episodes.append(
+                StoppedEpisode(episode=episode, host_name=host.name, position=position, paused=paused)
+            )
+
+        return stopped_episodes
+
     def start_playback(self, episode: EpisodeDetails) -> None:
         """Start playback of a given episode that was previously stopped and results were stored.
 
@@ -200,8 +300,8 @@ class LibraryManager:
             list[EpisodeDetails]: New episodes that were added to the library.
         """
 
-        # Get current episodes
-        episodes_before_scan = self.get_episodes_by_dir(show_dir)
+        # Get current episodes, as a set for constant time membership checks
+        episodes_before_scan = set(self.get_episodes_by_dir(show_dir))
 
         # Scanning
         scanned = False
@@ -222,6 +322,7 @@ class LibraryManager:
                 sleep(5)
 
         # Get current episodes (after scan)
+        self._invalidate_cache()
         episodes_after_scan = self.get_episodes_by_dir(show_dir)
 
         return [x for x in episodes_after_scan if x not in episodes_before_scan]
@@ -235,8 +336,8 @@ class LibraryManager:
         Returns:
             list[EpisodeDetails]: New episodes that were added to the library.
         """
-        # Get episodes before scan
-        episodes_before_scan = self._get_all_episodes()
+        # Get episodes before scan, as a set for constant time membership checks
+        episodes_before_scan = set(self._get_all_episodes())
 
         # Scan Video library
         scanned = False
@@ -257,6 +358,7 @@ class LibraryManager:
                 sleep(5)
 
         # Get episodes after scan
+        self._invalidate_cache()
         episodes_after_scan = self._get_all_episodes()
 
         # Calculate added episodes after scan and return
@@ -280,6 +382,7 @@ class LibraryManager:
 
                 # Clean video library
                 if host.clean_video_library():
+                    self._invalidate_cache()
                     return
 
             # Wait 5 seconds before trying all hosts again
@@ -295,12 +398,7 @@ class LibraryManager:
         Returns:
             list[EpisodeDetails]: Episodes gathered from the library.
         """
-        for host in self.hosts:
-            episodes = host.get_episodes_from_dir(show_dir)
-            if episodes:
-                return episodes
-
-        return []
+        return self._cached(("dir", show_dir), lambda: self._first_result(KodiRPC.get_episodes_from_dir, show_dir))
 
     def get_episodes_by_file(self, episode_path: str) -> list[EpisodeDetails]:
         """Get all episodes that reside in a specific file
@@ -311,45 +409,110 @@ class LibraryManager:
         Returns:
             list[EpisodeDetails]: Episodes gathered from the library.
         """
+        return self._cached(
+            ("file", episode_path), lambda: self._first_result(KodiRPC.get_episodes_from_file, episode_path)
+        )
+
+    def get_episodes_by_files(self, episode_paths: list[str]) -> list[EpisodeDetails]:
+        """Get all episodes that reside in any of the given files. Each host is queried with a single batch.
+
+        Args:
+            episode_paths (list[str]): the files to filter on.
+
+        Returns:
+            list[EpisodeDetails]: Episodes gathered from the library, in the order of episode_paths.
+                Episodes of a path given more than once are only listed once.
+        """
+        found: dict[str, list[EpisodeDetails]] = {
+            path: self._query_cache[("file", path)] for path in episode_paths if ("file", path) in self._query_cache
+        }
+        remaining = [x for x in dict.fromkeys(episode_paths) if x not in found]
         for host in self.hosts:
-            episodes = host.get_episodes_from_file(episode_path)
-            if episodes:
-                return episodes
+            if not remaining:
+                break
 
-        return []
+            # Files with no episodes on this host are retried on the next one
+            for path, episodes in zip(remaining, host.get_episodes_from_files(remaining)):
+                if episodes:
+                    found[path] = episodes
+            remaining = [x for x in remaining if x not in found]
+
+        for path, episodes in found.items():
+            self._query_cache[("file", path)] = episodes
+
+        # Each path once, repeated paths would list the same episodes again
+        return [ep for path in dict.fromkeys(episode_paths) for ep in found.get(path, ())]
 
-    def remove_episode(self, episode: EpisodeDetails) -> bool:
-        """Remove an episode from the library
+    def remove_episodes(self, episodes: list[EpisodeDetails]) -> list[EpisodeDetails]:
+        """Remove many episodes from the library. Each host is sent a single batch.
 
         Args:
-            episode (EpisodeDetails): The episode to remove
+            episodes (list[EpisodeDetails]): The episodes to remove
 
         Returns:
-            bool: True if the episode was removed
+            list[EpisodeDetails]: Episodes that were removed
         """
-        self.log.info("Removing episode %s", episode)
+        # Kodi rejects a second removal of the same episode id within a batch
+        by_id: dict[int, EpisodeDetails] = {}
+        for ep in episodes:
+            by_id.setdefault(ep.episode_id, ep)
+        episodes = list(by_id.values())
+
+        if episodes:
+            self.log.info("Removing episodes %s", ", ".join(map(str, episodes)))
+
+        removed: set[int] = set()
+        remaining = list(episodes)
         for host in self.hosts:
-            if host.remove_episode(episode.episode_id):
-                return True
+            if not remaining:
+                break
+
+            # Episodes that failed on this host are retried on the next one
+            results = host.remove_episodes([x.episode_id for x in remaining])
+            removed.update(ep.episode_id for ep, result in zip(remaining, results) if result)
+            remaining = [x for x in remaining if x.episode_id not in removed]
 
-        return False
+        if removed:
+            self._invalidate_cache()
 
-    def copy_ep_metadata(self, old_ep: EpisodeDetails, new_ep: EpisodeDetails) -> bool:
-        """Copy metadata from old episode to new episode
+        return [x for x in episodes if x.episode_id in removed]
+
+    def copy_metadata(
+        self, old_episodes: list[EpisodeDetails], new_episodes: list[EpisodeDetails]
+    ) -> list[EpisodeDetails]:
+        """Copy metadata from old library entries to the new entries of the same episodes. Sent as a batch per host.
 
         Args:
-            old_ep (EpisodeDetails): The episode to copy metadata from
-            new_ep (EpisodeDetails): The episode to copy metadata to
+            old_episodes (list[EpisodeDetails]): Episodes to copy metadata from
+            new_episodes (list[EpisodeDetails]): Episodes to copy metadata to, matched by show, season and episode
 
         Returns:
-            bool: True if the metadata was copied
+            list[EpisodeDetails]: New episodes that received metadata
         """
-        for host in self.hosts:
+        # Index new episodes by equality (show, season, episode) rather than comparing every pair
+        new_by_ep: dict[EpisodeDetails, list[EpisodeDetails]] = defaultdict(list)
+        for new_ep in new_episodes:
+            new_by_ep[new_ep].append(new_ep)
+        pairs = [(old_ep, new_ep) for old_ep in old_episodes for new_ep in new_by_ep.get(old_ep, ())]
+
+        for _, new_ep in pairs:
             self.log.info("Applying metadata to new episode : %s", new_ep)
-            if host.set_episode_watched_state(old_ep, new_ep.episode_id):
-                return True
 
-        return False
+        copied: set[int] = set()
+        remaining = list(range(len(pairs)))
+        for host in self.hosts:
+            if not remaining:
+                break
+
+            # Pairs that failed on this host are retried on the next one
+            results = host.set_episodes_watched_states([(pairs[i][0], pairs[i][1].episode_id) for i in remaining])
+            copied.update(i for i, result in zip(remaining, results) if result)
+            remaining = [i for i in remaining if i not in copied]
+
+        if copied:
+            self._invalidate_cache()
+
+        return [pairs[i][1] for i in sorted(copied)]
 
     # -------------- Show Methods --------------
     def remove_show(self, series_path: str) -> list[ShowDetails]:
@@ -381,6 +544,7 @@ class LibraryManager:
                 for show in [x for x in shows if x not in removed_shows]:
                     if host.remove_tvshow(show.show_id):
                         removed_shows.add(show)
+                        self._invalidate_cache()
 
                 if len(shows) == len(removed_shows):
                     return removed_shows
@@ -398,12 +562,7 @@ class LibraryManager:
         Returns:
             list[ShowDetails]: Shows gathered from the library.
         """
-        for host in self.hosts:
-            shows = host.get_shows_from_dir(directory)
-            if shows:
-                return shows
-
-        return []
+        return self._cached(("shows", directory), lambda: self._first_result(KodiRPC.get_shows_from_dir, directory))
 
     def show_exists(self, series_path: str) -> list[ShowDetails]:
         """Check if a directory contains a show
@@ -415,9 +574,4 @@ class LibraryManager:
             list[ShowDetails]: Shows that were found
         """
         self.log.debug("Checking for existing show in %s", series_path)
-        for host in self.hosts:
-            shows = host.get_shows_from_dir(series_path)
-            if shows:
-                return shows
-
-        return []
+        return self.get_shows_from_dir(series_path)
@@ -36,7 +36,7 @@ class Platform(Enum):
     UNKNOWN = "Unknown"
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(slots=True, frozen=True, order=True)
 class RPCVersion:
     """JSON-RPC Version info"""
 
@@ -48,7 +48,7 @@ class RPCVersion:
         return f"{self.major}.{self.minor}.{self.patch}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class KodiResponse:
     """Kodi JSON-RPC Response Model"""
 
@@ -57,7 +57,7 @@ class KodiResponse:
     result: Optional[dict] | None = field(default=None)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Player:
     """A Content player"""
 
@@ -66,7 +66,7 @@ class Player:
     type: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PlayerItem:
     """What the player is playing"""
 
@@ -75,7 +75,7 @@ class PlayerItem:
     type: str
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class ResumeState:
     """Resume Point of a Media Item"""
 
@@ -94,7 +94,7 @@ class ResumeState:
         return f"Resume {self.percent:.2f}% Complete."
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class WatchedState:
     """Watched State of a Media Item"""
 
@@ -131,7 +131,7 @@ class WatchedState:
         return f"Added={self.date_added} Plays={self.play_count} LastPlay={self.last_played} {self.resume}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ShowDetails:
     """Details of a Show"""
 
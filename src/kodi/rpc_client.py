@@ -1,11 +1,19 @@
 """Kodi JSON-RPC Interface"""
 
+import re
 import time
 import json
+import codecs
+import socket
 import logging
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import cached_property
 from pathlib import PurePosixPath, PureWindowsPath
+from typing import Iterator
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .exceptions import APIError, ScanTimeout
 from .models import (
     RPCVersion,
@@ -22,11 +30,87 @@ from .models import (
 )
 
 
+class _EventReader:
+    """Reads notifications from the raw JSON-RPC TCP interface of a Kodi host"""
+
+    # Notifications are small. Undecodable data beyond this is skipped rather than buffered
+    MAX_BUFFER = 65536
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+
+    def wait(self, method: str, timeout: float) -> bool:
+        """Wait for a notification
+
+        Args:
+            method (str): Notification to wait for
+            timeout (float): Maximum time to wait
+
+        Raises:
+            OSError: The socket failed or was closed by the host
+
+        Returns:
+            bool: True if the notification was received
+        """
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            self.sock.settimeout(remaining)
+            try:
+                chunk = self.sock.recv(4096)
+            except TimeoutError:
+                return False
+
+            if not chunk:
+                raise ConnectionError("Notification socket closed by host")
+
+            self._buffer += self._utf8.decode(chunk)
+            if self._received(method):
+                return True
+
+        return False
+
+    def _received(self, method: str) -> bool:
+        """Decode buffered notifications, True if one of them is method"""
+        buffer = self._buffer
+        found = False
+        # Notifications are sent as concatenated JSON objects without a delimiter
+        while not found and (buffer := buffer.lstrip()):
+            if not buffer.startswith("{"):
+                # Not the start of a notification, skip ahead to the next one
+                start = buffer.find("{")
+                buffer = buffer[start:] if start >= 0 else ""
+                continue
+
+            try:
+                msg, end = self._decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Incomplete object, wait for more data unless it is too large to be a notification
+                if len(buffer) <= self.MAX_BUFFER:
+                    break
+                buffer = buffer[1:]
+                continue
+
+            buffer = buffer[end:]
+            found = isinstance(msg, dict) and msg.get("method") == method
+
+        self._buffer = buffer
+        return found
+
+
 class KodiRPC:
     """Kodi JSON-RPC Client"""
 
     RETRIES = 3
     TIMEOUT = 5
+    BATCH_SIZE = 20
+    EVENT_PORT = 9090
+    EVENT_WAIT = 2
+    PLAYERS_TTL = 0.5
+    SCAN_FINISHED = "VideoLibrary.OnScanFinished"
+    CLEAN_FINISHED = "VideoLibrary.OnCleanFinished"
     HEADERS = {"Content-Type": "application/json", "Accept": "plain/text"}
 
     def __init__(
@@ -42,36 +126,47 @@ class KodiRPC:
     ) -> None:
         self.log = logging.getLogger(f"Kodi.{name}")
         self.base_url = f"http://{ip_addr}:{port}/jsonrpc"
+        self.ip_addr = ip_addr
         self.name = name
         self.disable_notifications = disable_notifications
         self.priority = priority
-        self.path_maps = path_maps
+        self.path_maps = path_maps or []
+        self._path_lookup = {x["sonarr"]: x["kodi"] for x in reversed(self.path_maps)}
+        self._mapped_paths: dict[str, str] = {}
+        self._path_pattern = None
+        if self._path_lookup:
+            # Anchored alternation tried longest first, so the most specific mapping prefix wins
+            prefixes = sorted(self._path_lookup, key=len, reverse=True)
+            self._path_pattern = re.compile("|".join(map(re.escape, prefixes)))
         self.library_scanned = False
-        self._platform: Platform = None
+        # Cleared after the notification socket fails to connect, then scans are only polled
+        self._events_available = True
+        # Monotonic time and result of the last active players query
+        self._players_cache: tuple[float, list[Player]] | None = None
 
         # Establish session
         self.session = requests.Session()
         if user and password:
             self.session.auth = (user, password)
         self.session.headers.update(self.HEADERS)
+        # Keep connections alive between calls. Connect retries are enabled once is_alive gets an answer,
+        # so probing an unreachable host costs a single timeout
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0)
+        self.session.mount("http://", self._adapter)
         self.req_id = 0
 
     def __str__(self) -> str:
         return f"{self.name} JSON-RPC({self.rpc_version})"
 
-    @property
+    @cached_property
     def platform(self) -> Platform:
-        """Get platform of this client"""
-        if self._platform:
-            return self._platform
-
+        """Get platform of this client. Queried once per process"""
         params = {"booleans": [x.value for x in Platform]}
         try:
             resp = self._req("XBMC.GetInfoBooleans", params=params)
         except APIError as e:
             self.log.warning("Failed to get platform info. Error: %s", e)
-            self._platform = Platform.UNKNOWN
-            return self._platform
+            return Platform.UNKNOWN
 
         # Check all platform booleans and return the first one that is True
         for k, v in resp.result.items():
@@ -79,8 +174,7 @@ class KodiRPC:
                 return Platform(k)
 
         # Return unknown if no platform booleans are True
-        self._platform = Platform.UNKNOWN
-        return self._platform
+        return Platform.UNKNOWN
 
     @property
     def rpc_version(self) -> RPCVersion | None:
@@ -99,14 +193,21 @@ class KodiRPC:
 
     @property
     def is_alive(self) -> bool:
-        """Return True if Kodi Host is responsive"""
+        """Return True if Kodi Host is responsive. Once it is, failed connects are retried up to RETRIES times"""
         try:
             resp = self._req("JSONRPC.Ping")
         except APIError as e:
             self.log.warning("Failed to ping host. Error: %s", e)
             return False
 
-        return resp.result == "pong"
+        if resp.result != "pong":
+            return False
+
+        # Only connection failures are retried, a POST may not be idempotent
+        self._adapter.max_retries = Retry(
+            total=self.RETRIES, connect=self.RETRIES, read=0, status=0, backoff_factor=0.1
+        )
+        return True
 
     @property
     def is_playing(self) -> bool:
@@ -115,7 +216,11 @@ class KodiRPC:
 
     @property
     def active_players(self) -> list[Player]:
-        """Get a list of active players"""
+        """Get a list of active players. Reused for PLAYERS_TTL seconds unless a player is changed"""
+        now = time.monotonic()
+        if self._players_cache and now - self._players_cache[0] < self.PLAYERS_TTL:
+            return list(self._players_cache[1])
+
         try:
             resp = self._req("Player.GetActivePlayers")
         except APIError as e:
@@ -132,7 +237,8 @@ class KodiRPC:
                 )
             )
 
-        return active_players
+        self._players_cache = (now, active_players)
+        return list(active_players)
 
     @property
     def is_scanning(self) -> bool:
@@ -196,17 +302,23 @@ class KodiRPC:
 
     # --------------- Helper Methods -----------------
     def _map_path(self, path: str) -> str:
-        """Map path from Sonarr to Kodi path using path_maps"""
+        """Map path from Sonarr to Kodi path using path_maps. Results are memoized per host"""
+        mapped = self._mapped_paths.get(path)
+        if mapped is not None:
+            return mapped
+
         out_str = path
-        for mapping in self.path_maps:
-            if mapping["sonarr"] in path:
-                out_str = path.replace(mapping["sonarr"], mapping["kodi"])
-                break
+        match = self._path_pattern.match(path) if self._path_pattern else None
+        if match:
+            out_str = self._path_lookup[match.group()] + path[match.end() :]
 
         if self.is_posix:
-            return str(PurePosixPath(out_str))
+            mapped = str(PurePosixPath(out_str))
+        else:
+            mapped = str(PureWindowsPath(out_str))
 
-        return str(PureWindowsPath(out_str))
+        self._mapped_paths[path] = mapped
+        return mapped
 
     def _get_filename_from_path(self, path: str) -> str:
         """Extract filename from path based on os type"""
@@ -220,39 +332,81 @@ class KodiRPC:
             return str(PurePosixPath(path).parent)
         return str(PureWindowsPath(path).parent)
 
-    def _wait_for_video_scan(self, max_secs: int = 1800) -> timedelta:
-        """Wait for video scan to complete"""
+    @contextmanager
+    def _event_socket(self) -> Iterator[_EventReader | None]:
+        """Connect to the JSON-RPC notification socket of this host. Yields None if it is unavailable"""
+        sock = None
+        if self._events_available:
+            try:
+                sock = socket.create_connection((self.ip_addr, self.EVENT_PORT), timeout=self.TIMEOUT)
+            except OSError as e:
+                self.log.debug("Notification socket unavailable, polling scan state instead. Error: %s", e)
+                self._events_available = False
+
+        try:
+            yield _EventReader(sock) if sock is not None else None
+        finally:
+            if sock is not None:
+                sock.close()
+
+    def _wait_for_video_scan(
+        self, max_secs: int = 1800, events: _EventReader = None, finished: str = SCAN_FINISHED
+    ) -> timedelta:
+        """Wait for video scan to complete
+
+        Args:
+            max_secs (int, optional): Maximum time to wait. Defaults to 1800.
+            events (_EventReader, optional): Notification socket, connected before the scan was requested. The
+                scanning state is still checked every EVENT_WAIT seconds in case the notification is never sent.
+                Polls the scanning state every 100ms when not given or the socket fails. Defaults to None.
+            finished (str, optional): Notification sent when done. Defaults to SCAN_FINISHED.
+
+        Raises:
+            ScanTimeout: The scan did not complete in time
+
+        Returns:
+            timedelta: Time taken to complete
+        """
         # Default timeout = 30 Min
-        start = datetime.now()
+        start = time.monotonic()
         self.log.debug("Waiting up to %s minuets for library scan to complete", max_secs / 60)
         while True:
-            elapsed = datetime.now() - start
+            # Wake on the finished notification, falling through to a state check if it does not arrive
+            if events is not None:
+                try:
+                    remaining = max_secs - (time.monotonic() - start)
+                    if events.wait(finished, min(self.EVENT_WAIT, remaining)):
+                        return timedelta(seconds=time.monotonic() - start)
+                except OSError as e:
+                    self.log.debug("Notification socket failed, polling scan state instead. Error: %s", e)
+                    events = None
+
+            elapsed = time.monotonic() - start
 
             # Check if scanning, may raise APIError if failed to communicate
             if not self.is_scanning:
-                return elapsed
+                return timedelta(seconds=elapsed)
 
             # Break out if time limit exceeded
-            if elapsed.total_seconds() >= max_secs:
-                raise ScanTimeout(f"Waited for {elapsed}. Giving up.")
+            if elapsed >= max_secs:
+                raise ScanTimeout(f"Waited for {timedelta(seconds=elapsed)}. Giving up.")
 
-            # Sleep for 100ms before checking again
-            time.sleep(0.1)
+            # Without notifications, sleep for 100ms before checking again
+            if events is None:
+                time.sleep(0.1)
 
-    def _req(self, method: str, params: dict = None, timeout: int = None) -> KodiResponse | None:
-        """Send request to this Kodi Host"""
-        req_params = {"jsonrpc": "2.0", "id": self.req_id, "method": method}
-        if params:
-            req_params["params"] = params
-        response = None
+    def _post(self, payload: dict | list, timeout: int = None) -> dict | list:
+        """POST a JSON-RPC payload to this Kodi Host and return the decoded body"""
+        timeout = timeout or self.TIMEOUT
+        resp = None
         try:
             resp = self.session.post(
                 url=self.base_url,
-                data=json.dumps(req_params).encode("utf-8"),
-                timeout=timeout or self.TIMEOUT,
+                json=payload,
+                timeout=timeout,
             )
             resp.raise_for_status()
-            response = resp.json()
+            return resp.json()
         except requests.Timeout as e:
             raise APIError(f"Request timed out after {timeout}s") from e
         except requests.HTTPError as e:
@@ -261,6 +415,14 @@ class KodiRPC:
             raise APIError(f"HTTP Error. Error: {e}") from e
         except requests.ConnectionError as e:
             raise APIError(f"Connection Error. {e}") from e
+
+    def _req(self, method: str, params: dict = None, timeout: int = None) -> KodiResponse | None:
+        """Send request to this Kodi Host"""
+        req_params = {"jsonrpc": "2.0", "id": self.req_id, "method": method}
+        if params:
+            req_params["params"] = params
+        try:
+            response = self._post(req_params, timeout)
         finally:
             self.req_id += 1
 
@@ -273,6 +435,59 @@ class KodiRPC:
             result=response.get("result"),
         )
 
+    def _req_batch(self, calls: list[tuple[str, dict]], timeout: int = None) -> list[KodiResponse | APIError]:
+        """Send many requests to this Kodi Host as JSON-RPC batches of at most BATCH_SIZE requests
+
+        Args:
+            calls (list[tuple[str, dict]]): Method and params of each request
+            timeout (int, optional): Seconds to wait for each batch. Defaults to TIMEOUT.
+
+        Returns:
+            list[KodiResponse | APIError]: Result of each call in the order given. Failed calls are returned as
+                APIError, including every call of a batch that could not be sent and of the batches after it
+        """
+        results: list[KodiResponse | APIError] = []
+        for i in range(0, len(calls), self.BATCH_SIZE):
+            try:
+                results.extend(self._send_batch(calls[i : i + self.BATCH_SIZE], timeout))
+            except APIError as e:
+                # Keep results of batches already applied, stop sending to a host that failed
+                results.extend([e] * (len(calls) - i))
+                break
+
+        return results
+
+    def _send_batch(self, calls: list[tuple[str, dict]], timeout: int = None) -> list[KodiResponse | APIError]:
+        """Send a single JSON-RPC batch and match the responses to calls"""
+        first_id = self.req_id
+        self.req_id += len(calls)
+        batch = []
+        for req_id, (method, params) in enumerate(calls, start=first_id):
+            req_params = {"jsonrpc": "2.0", "id": req_id, "method": method}
+            if params:
+                req_params["params"] = params
+            batch.append(req_params)
+
+        # Responses may arrive in any order, match them by id. A rejected batch is a single error object
+        response = self._post(batch, timeout)
+        if not isinstance(response, list):
+            return [APIError(response.get("error", "Invalid batch response"))] * len(calls)
+        responses = {x.get("id"): x for x in response}
+
+        results: list[KodiResponse | APIError] = []
+        for req_id in range(first_id, first_id + len(calls)):
+            response = responses.get(req_id)
+            if response is None:
+                results.append(APIError(f"No response to request {req_id} in batch"))
+            elif "error" in response:
+                results.append(APIError(response.get("error")))
+            else:
+                results.append(
+                    KodiResponse(req_id=req_id, jsonrpc=response.get("jsonrpc"), result=response.get("result"))
+                )
+
+        return results
+
     def close_session(self) -> None:
         """Close the session"""
         self.log.debug("Closing session")
@@ -288,6 +503,16 @@ class KodiRPC:
         except APIError as e:
             self.log.warning("Failed to update GUI. Error: %s", e)
 
+    @staticmethod
+    def _notification_params(title: str, msg: str, display_time: int) -> dict:
+        """Params of a single GUI Notification"""
+        return {
+            "title": str(title),
+            "message": str(msg),
+            "displaytime": int(display_time),
+            "image": "https://github.com/jsaddiction/Sonarr_Kodi/raw/main/img/sonarr.png",
+        }
+
     def notify(self, title: str, msg: str, force: bool = False, display_time: int = 5000) -> None:
         """Send GUI Notification to Kodi Host"""
         # Skip if notifications are disabled and not forced
@@ -295,18 +520,28 @@ class KodiRPC:
             self.log.debug("All Host GUI Notifications disabled. Skipping.")
             return
 
-        params = {
-            "title": str(title),
-            "message": str(msg),
-            "displaytime": int(display_time),
-            "image": "https://github.com/jsaddiction/Sonarr_Kodi/raw/main/img/sonarr.png",
-        }
+        params = self._notification_params(title, msg, display_time)
         self.log.info("Sending GUI Notification :: (title='%s', msg='%s'", title, msg)
         try:
             self._req("GUI.ShowNotification", params=params)
         except APIError as e:
             self.log.warning("Failed to send notification. Error: %s", e)
 
+    def notify_many(self, title: str, msgs: list[str], force: bool = False, display_time: int = 5000) -> None:
+        """Send many GUI Notifications with the same title to Kodi Host in one batch"""
+        # Skip if notifications are disabled and not forced
+        if self.disable_notifications and not force:
+            self.log.debug("All Host GUI Notifications disabled. Skipping.")
+            return
+
+        calls = [("GUI.ShowNotification", self._notification_params(title, msg, display_time)) for msg in msgs]
+        self.log.info("Sending %s GUI Notifications :: (title='%s')", len(calls), title)
+        responses = self._req_batch(calls)
+
+        for msg, resp in zip(msgs, responses):
+            if isinstance(resp, APIError):
+                self.log.warning("Failed to send notification '%s'. Error: %s", msg, resp)
+
     # --------------- Player Methods -----------------
     def is_paused(self, player_id: int) -> bool:
         """Return True if player is currently paused"""
@@ -355,6 +590,7 @@ class KodiRPC:
     def pause_player(self, player_id: int, max_retries: int = 3) -> None:
         """Pauses a player"""
         params = {"playerid": player_id}
+        self._players_cache = None
         for _ in range(max_retries):
             try:
                 resp = self._req("Player.PlayPause", params=params)
@@ -369,6 +605,7 @@ class KodiRPC:
     def stop_player(self, player_id: int) -> None:
         """Stops a player"""
         params = {"playerid": player_id}
+        self._players_cache = None
         try:
             self._req("Player.Stop", params=params)
         except APIError as e:
@@ -378,6 +615,7 @@ class KodiRPC:
         """Play a given episode"""
         self.log.info("Restarting Episode %s", episode_id)
         params = {"item": {"episodeid": episode_id}, "options": {"resume": position}}
+        self._players_cache = None
         try:
             self._req("Player.Open", params=params)
         except APIError as e:
@@ -385,7 +623,7 @@ class KodiRPC:
             return None
 
         # Wait for player to start
-        start = datetime.now()
+        start = time.monotonic()
         while True:
             for player in self.active_players:
                 item = self.get_player_item(player.player_id)
@@ -393,10 +631,13 @@ class KodiRPC:
                     return player
 
             # Break out if time limit exceeded
-            if (datetime.now() - start).total_seconds() > 5:
+            if time.monotonic() - start > 5:
                 self.log.warning("Episode failed to start after 5 second. Giving up.")
                 return None
 
+            # Sleep for 100ms before checking again
+            time.sleep(0.1)
+
     # --------------- Library Methods ----------------
     def scan_series_dir(self, directory: str) -> bool:
         """Scan a directory"""
@@ -405,20 +646,22 @@ class KodiRPC:
         mapped_path = mapped_path.rstrip("/") + "/"
         params = {"directory": mapped_path, "showdialogs": False}
 
-        # Scan the Directory
-        self.log.info("Scanning directory '%s'", mapped_path)
-        try:
-            self._req("VideoLibrary.Scan", params=params)
-        except APIError as e:
-            self.log.warning("Failed to scan %s. Error: %s", mapped_path, e)
-            return False
+        # Listen for notifications before requesting, so one sent by a quick scan is not missed
+        with self._event_socket() as events:
+            # Scan the Directory
+            self.log.info("Scanning directory '%s'", mapped_path)
+            try:
+                self._req("VideoLibrary.Scan", params=params)
+            except APIError as e:
+                self.log.warning("Failed to scan %s. Error: %s", mapped_path, e)
+                return False
 
-        # Wait for library to scan
-        try:
-            elapsed = self._wait_for_video_scan(max_secs=120)
-        except ScanTimeout as e:
-            self.log.warning("Scan timed out. Error: %s", e)
-            return False
+            # Wait for library to scan
+            try:
+                elapsed = self._wait_for_video_scan(max_secs=120, events=events)
+            except ScanTimeout as e:
+                self.log.warning("Scan timed out. Error: %s", e)
+                return False
 
         self.log.info("Scan completed in %s", elapsed)
         self.library_scanned = True
@@ -427,18 +670,21 @@ class KodiRPC:
     def full_video_scan(self) -> bool:
         """Perform full video library scan"""
         params = {"showdialogs": False}
-        self.log.info("Performing full library scan")
-        try:
-            self._req("VideoLibrary.Scan", params=params)
-        except APIError as e:
-            self.log.warning("Failed to scan full library. Error: %s", e)
-            return False
 
-        try:
-            elapsed = self._wait_for_video_scan()
-        except ScanTimeout as e:
-            self.log.warning("Scan timed out. Error: %s", e)
-            return False
+        # Listen for notifications before requesting, so one sent by a quick scan is not missed
+        with self._event_socket() as events:
+            self.log.info("Performing full library scan")
+            try:
+                self._req("VideoLibrary.Scan", params=params)
+            except APIError as e:
+                self.log.warning("Failed to scan full library. Error: %s", e)
+                return False
+
+            try:
+                elapsed = self._wait_for_video_scan(events=events)
+            except ScanTimeout as e:
+                self.log.warning("Scan timed out. Error: %s", e)
+                return False
 
         self.log.info("Scan completed in %s", elapsed)
         self.library_scanned = True
@@ -450,29 +696,31 @@ class KodiRPC:
         # Preferably, should set {'directory': series_dir} vice {'content': 'tvshows'}
         params = {"showdialogs": False, "content": "tvshows"}
 
-        self.log.info("Cleaning tvshows library.")
-        try:
-            self._req("VideoLibrary.Clean", params=params)
-        except APIError as e:
-            self.log.warning("Failed to clean library. Error: %s", e)
-            return False
+        # Listen for notifications before requesting, so one sent by a quick scan is not missed
+        with self._event_socket() as events:
+            self.log.info("Cleaning tvshows library.")
+            try:
+                self._req("VideoLibrary.Clean", params=params)
+            except APIError as e:
+                self.log.warning("Failed to clean library. Error: %s", e)
+                return False
 
-        # Wait for cleaning to complete
-        try:
-            elapsed = self._wait_for_video_scan(max_secs=300)
-        except ScanTimeout as e:
-            self.log.warning("Library Clean timed out. Error: %s", e)
-            return False
+            # Wait for cleaning to complete
+            try:
+                elapsed = self._wait_for_video_scan(max_secs=300, events=events, finished=self.CLEAN_FINISHED)
+            except ScanTimeout as e:
+                self.log.warning("Library Clean timed out. Error: %s", e)
+                return False
 
         self.log.info("Library Clean completed in %s", elapsed)
         self.library_scanned = True
         return True
 
     # ----------------- Episode Methods ---------------
-    def set_episode_watched_state(self, episode: EpisodeDetails, new_ep_id: int) -> bool:
-        """Set Episode Watched State"""
-        self.log.debug("Setting watched state %s on %s", episode.watched_state, episode)
-        params = {
+    @staticmethod
+    def _watched_state_params(episode: EpisodeDetails, new_ep_id: int) -> dict:
+        """Params to apply the watched state of episode onto new_ep_id"""
+        return {
             "episodeid": new_ep_id,
             "playcount": episode.watched_state.play_count,
             "lastplayed": episode.watched_state.last_played_str,
@@ -483,13 +731,19 @@ class KodiRPC:
             },
         }
 
-        try:
-            self._req("VideoLibrary.SetEpisodeDetails", params=params)
-        except APIError as e:
-            self.log.warning("Failed to set episode metadata. Error: %s", e)
-            return False
+    def set_episodes_watched_states(self, states: list[tuple[EpisodeDetails, int]]) -> list[bool]:
+        """Set many Episode Watched States in one batch and return which were set"""
+        calls = [("VideoLibrary.SetEpisodeDetails", self._watched_state_params(ep, new_id)) for ep, new_id in states]
+        self.log.debug("Setting watched states of %s episodes", len(calls))
+        responses = self._req_batch(calls)
 
-        return True
+        results = []
+        for (episode, _), resp in zip(states, responses):
+            if isinstance(resp, APIError):
+                self.log.warning("Failed to set episode metadata of %s. Error: %s", episode, resp)
+            results.append(not isinstance(resp, APIError))
+
+        return results
 
     def get_all_episodes(self) -> list[EpisodeDetails]:
         """Get all episodes in library, waits upto a minuet for response"""
@@ -503,21 +757,23 @@ class KodiRPC:
 
         return [self._parse_ep_details(x) for x in resp.result["episodes"]]
 
-    def get_episodes_from_file(self, file_path: str) -> list[EpisodeDetails]:
-        """Get details of episodes given a file_path"""
-        mapped_path = self._map_path(file_path)
-        file_name = self._get_filename_from_path(mapped_path)
-        file_dir = self._get_dirname_from_path(mapped_path)
-        params = {
+    def _episode_file_params(self, mapped_path: str) -> dict:
+        """Params to query episodes of a single, already mapped, file"""
+        return {
             "properties": EP_PROPERTIES,
             "filter": {
                 "and": [
-                    {"operator": "startswith", "field": "path", "value": file_dir},
-                    {"operator": "is", "field": "filename", "value": file_name},
+                    {"operator": "startswith", "field": "path", "value": self._get_dirname_from_path(mapped_path)},
+                    {"operator": "is", "field": "filename", "value": self._get_filename_from_path(mapped_path)},
                 ]
             },
         }
 
+    def get_episodes_from_file(self, file_path: str) -> list[EpisodeDetails]:
+        """Get details of episodes given a file_path"""
+        mapped_path = self._map_path(file_path)
+        params = self._episode_file_params(mapped_path)
+
         self.log.debug("Getting all episodes from path %s", mapped_path)
         try:
             resp = self._req("VideoLibrary.GetEpisodes", params=params)
@@ -527,6 +783,24 @@ class KodiRPC:
 
         return [self._parse_ep_details(x) for x in resp.result["episodes"]]
 
+    def get_episodes_from_files(self, file_paths: list[str]) -> list[list[EpisodeDetails]]:
+        """Get details of episodes of many files in one batch. Files that failed yield an empty list"""
+        mapped_paths = [self._map_path(x) for x in file_paths]
+        calls = [("VideoLibrary.GetEpisodes", self._episode_file_params(x)) for x in mapped_paths]
+
+        self.log.debug("Getting all episodes from paths %s", mapped_paths)
+        responses = self._req_batch(calls)
+
+        results = []
+        for mapped_path, resp in zip(mapped_paths, responses):
+            if isinstance(resp, APIError):
+                self.log.warning("Failed to get episodes from file '%s'. Error: %s", mapped_path, resp)
+                results.append([])
+                continue
+            results.append([self._parse_ep_details(x) for x in resp.result.get("episodes", [])])
+
+        return results
+
     def get_episodes_from_dir(self, series_dir: str) -> list[EpisodeDetails]:
         """Get all episodes given a directory"""
         mapped_path = self._map_path(series_dir)
@@ -556,18 +830,22 @@ class KodiRPC:
 
         return self._parse_ep_details(resp.result["episodedetails"])
 
-    def remove_episode(self, episode_id: int) -> bool:
-        """Remove an episode from library and return it's details"""
-        params = {"episodeid": episode_id}
-        self.log.debug("Removing episode with episode id %s", episode_id)
-        try:
-            self._req("VideoLibrary.RemoveEpisode", params=params)
-        except APIError as e:
-            self.log.warning("Failed to remove episode by id '%s'. Error: %s", episode_id, e)
-            return False
+    def remove_episodes(self, episode_ids: list[int]) -> list[bool]:
+        """Remove many episodes from library in one batch and return which were removed"""
+        calls = [("VideoLibrary.RemoveEpisode", {"episodeid": x}) for x in episode_ids]
+        self.log.debug("Removing episodes with episode ids %s", episode_ids)
+        responses = self._req_batch(calls)
 
-        self.library_scanned = True
-        return True
+        removed = []
+        for episode_id, resp in zip(episode_ids, responses):
+            if isinstance(resp, APIError):
+                self.log.warning("Failed to remove episode by id '%s'. Error: %s", episode_id, resp)
+            removed.append(not isinstance(resp, APIError))
+
+        if any(removed):
+            self.library_scanned = True
+
+        return removed
 
     # ------------------ Show Methods ------------------
     def remove_tvshow(self, show_id: int) -> ShowDetails | None: